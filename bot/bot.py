@@ -1,10 +1,12 @@
 import os
+import asyncio
 import logging
 import traceback
 import html
 import json
 import requests
 import re
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -24,6 +26,7 @@ import config
 import database
 import chatgpt
 import deribit_ws
+import intent_router
 
 
 # setup
@@ -52,9 +55,16 @@ Discover what options whales are trading 🚀
 Contact @pieceofelephant and get block trade alerts for FREE!
 </i>
 """
+COINGECKO_TIMEOUT = 5  # in seconds
 config_dir = Path(__file__).parent.parent.resolve() / "config"
 with open(config_dir / "SYMBOL2ID.json", 'r') as f:
     symbol_to_id = json.load(f)
+router = intent_router.IntentRouter(symbol_to_id)
+
+
+class CoinDataError(Exception):
+    """Raised with a message that can be shown to the user as is."""
+
 
 async def register_user_if_not_exists(update: Update, context: CallbackContext, user: User):
     if not db.check_if_user_exists(user.id):
@@ -86,53 +96,58 @@ async def start_handle(update: Update, context: CallbackContext):
 async def help_handle(update: Update, context: CallbackContext):
     await update.message.reply_text(HELP_MESSAGE, parse_mode=ParseMode.HTML)
 
-async def coin_handle(update: Update, context: CallbackContext):
-    args = context.args
-    if len(args) == 0:
-        await update.message.reply_text('eg. /coin btc')
-        return
-    
-    currency = args[0].upper()
+async def get_coin_message(currency, require_dvol=False):
     id = symbol_to_id.get(currency)
     if id is None:
-        await update.message.reply_text('Token cannot be found. Please check its symbol is correct.')
-        return
+        raise CoinDataError('Token cannot be found. Please check its symbol is correct.')
 
     # 发送请求获取货币数据
     url = 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&ids={}'.format(id)
-    response = requests.get(url)
+    # run the blocking request in a thread, so a slow response doesn't block other updates
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(None, lambda: requests.get(url, timeout=COINGECKO_TIMEOUT))
     if response.status_code != 200:
-        await update.message.reply_text('Data is not available. Please try again later.')
-        return
+        raise CoinDataError('Data is not available. Please try again later.')
     data = response.json()
     if len(data) == 0:
-        await update.message.reply_text('Token cannot be found. Please check its symbol is correct.')
-        return
+        raise CoinDataError('Token cannot be found. Please check its symbol is correct.')
+
+    name = data[0]['name']
+    price = data[0]['current_price']
+    change = data[0]['price_change_percentage_24h']
+    high_24h = data[0]['high_24h']
+    low_24h = data[0]['low_24h']
+    volume = data[0]['total_volume']
+    market_cap = data[0]['market_cap']
+    market_cap_rank = data[0]['market_cap_rank']
+
+    message = f'<i>📜{name}📜\n\nRank:{market_cap_rank}\n1 Day Price Change: {change:.2f}%{"📈" if change>0 else "📉"}\n💵Price: ${price:.6f}\n⬆️High in 24 hours: ${high_24h:.6f}\n⬇️Low in 24 hours: ${low_24h:.6f}\nTotal Volume: ${volume:,}\nMarket Cap: ${market_cap:,}'
+    if currency in ["BTC", "ETH"]:
+        deribit_ws_instance = deribit_ws.DeribitWS(client_id=config.deribit_id, client_secret=config.deribit_secret)
+        res = await deribit_ws_instance.ws_operation("subscribe", f"deribit_volatility_index.{currency.lower()}_usd")
+        if not res["params"]["data"]["volatility"]:
+            logger.error("DVOL is not available.")
+            if require_dvol:
+                raise CoinDataError('DVOL is not available. Please try again later.')
+        else:
+            message += f'\nDVOL: {res["params"]["data"]["volatility"]:.2f}'
+    message += '</i>'
 
-    try:
-        name = data[0]['name']
-        price = data[0]['current_price']
-        change = data[0]['price_change_percentage_24h']
-        high_24h = data[0]['high_24h']
-        low_24h = data[0]['low_24h']
-        volume = data[0]['total_volume']
-        market_cap = data[0]['market_cap']
-        market_cap_rank = data[0]['market_cap_rank']
+    return message
 
+async def coin_handle(update: Update, context: CallbackContext):
+    args = context.args
+    if len(args) == 0:
+        await update.message.reply_text('eg. /coin btc')
+        return
+    
+    currency = args[0].upper()
+    try:
         # 发送响应消息
-        if currency in ["BTC", "ETH"]:
-            deribit_ws_instance = deribit_ws.DeribitWS(client_id=config.deribit_id, client_secret=config.deribit_secret)
-            res = await deribit_ws_instance.ws_operation("subscribe", f"deribit_volatility_index.{currency.lower()}_usd")
-            if not res["params"]["data"]["volatility"]:
-                logger.error("DVOL is not available.")
-                message = f'<i>📜{name}📜\n\nRank:{market_cap_rank}\n1 Day Price Change: {change:.2f}%{"📈" if change>0 else "📉"}\n💵Price: ${price:.6f}\n⬆️High in 24 hours: ${high_24h:.6f}\n⬇️Low in 24 hours: ${low_24h:.6f}\nTotal Volume: ${volume:,}\nMarket Cap: ${market_cap:,}</i>'
-            else:
-                message = f'<i>📜{name}📜\n\nRank:{market_cap_rank}\n1 Day Price Change: {change:.2f}%{"📈" if change>0 else "📉"}\n💵Price: ${price:.6f}\n⬆️High in 24 hours: ${high_24h:.6f}\n⬇️Low in 24 hours: ${low_24h:.6f}\nTotal Volume: ${volume:,}\nMarket Cap: ${market_cap:,}\nDVOL: {res["params"]["data"]["volatility"]:.2f}</i>'
-                
-        else:
-            message = f'<i>📜{name}📜\n\nRank:{market_cap_rank}\n1 Day Price Change: {change:.2f}%{"📈" if change>0 else "📉"}\n💵Price: ${price:.6f}\n⬆️High in 24 hours: ${high_24h:.6f}\n⬇️Low in 24 hours: ${low_24h:.6f}\nTotal Volume: ${volume:,}\nMarket Cap: ${market_cap:,}</i>'
-
+        message = await get_coin_message(currency)
         await update.message.reply_text(message, parse_mode=ParseMode.HTML)
+    except CoinDataError as e:
+        await update.message.reply_text(str(e))
     except Exception as e:
         error_text = f"Something went wrong during completion.\nReason: {e}"
         logger.error(error_text)
@@ -169,12 +184,18 @@ async def message_handle(update: Update, context: CallbackContext, message=None,
                 await update.message.reply_text(text, parse_mode=ParseMode.HTML)
                 return
             else:
+                # answer market-data questions locally without calling ChatGPT
+                if config.use_intent_router and await route_message(update, user_id, message):
+                    return
+
                 chatgpt_instance = chatgpt.ChatGPT(use_chatgpt_api=config.use_chatgpt_api)
+                start_time = time.monotonic()
                 answer, n_used_tokens, n_first_dialog_messages_removed = await chatgpt_instance.send_message(
                     message,
                     dialog_messages=db.get_dialog_messages(user_id, dialog_id=None),
                     chat_mode=db.get_user_attribute(user_id, "current_chat_mode"),
                 )
+                router.stats.record_llm_call(time.monotonic() - start_time, n_used_tokens)
 
                 # update user data
                 new_dialog_message = {"user": message, "bot": answer, "date": datetime.now()}
@@ -208,6 +229,34 @@ async def message_handle(update: Update, context: CallbackContext, message=None,
         await update.message.reply_text(error_text)
 
 
+async def route_message(update: Update, user_id: int, message: str) -> bool:
+    route = router.route(message)
+    if route is None:
+        router.stats.record_fallback("no market-data intent")
+        return False
+
+    intent, currency = route
+    start_time = time.monotonic()
+    try:
+        answer = await get_coin_message(currency, require_dvol=(intent == "dvol"))
+    except Exception as e:
+        # fall back to ChatGPT if market data is not available
+        logger.error(f"Intent router failed to answer '{intent}' for {currency}.\nReason: {e}")
+        router.stats.record_fallback(f"failed to answer '{intent}' for {currency}")
+        return False
+    router.stats.record_local_answer(intent, time.monotonic() - start_time)
+
+    new_dialog_message = {"user": message, "bot": answer, "date": datetime.now()}
+    db.set_dialog_messages(
+        user_id,
+        db.get_dialog_messages(user_id, dialog_id=None) + [new_dialog_message],
+        dialog_id=None
+    )
+
+    await update.message.reply_text(answer, parse_mode=ParseMode.HTML)
+    return True
+
+
 async def error_handle(update: Update, context: CallbackContext) -> None:
     logger.error(msg="Exception while handling an update:", exc_info=context.error)
 
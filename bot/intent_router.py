@@ -0,0 +1,174 @@
+import re
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+PRICE_KEYWORDS = {"price", "prices", "px", "quote", "价格", "币价"}
+CHANGE_KEYWORDS = {"change", "changes", "24h", "1d", "daily", "performance", "涨跌", "涨幅"}
+DVOL_KEYWORDS = {"dvol", "iv", "vol", "volatility", "波动率"}
+INFO_KEYWORDS = {"info", "stats", "mcap", "marketcap", "cap", "rank", "volume", "行情"}
+
+# words that may surround a market-data question without changing its meaning
+FILLER_WORDS = {
+    "what", "whats", "what's", "s", "is", "are", "the", "a", "of", "for", "on", "in", "at", "to",
+    "now", "current", "currently", "today", "todays", "today's", "right", "latest", "live",
+    "how", "much", "does", "do", "tell", "me", "show", "check", "get", "give", "please", "pls", "plz",
+    "usd", "market", "24", "hour", "hours", "day", "last",
+    "是多少", "多少", "现在", "目前", "今天", "今日", "的", "查询", "查", "一下",
+}
+
+# common coin names, matched before SYMBOL2ID symbols
+SYMBOL_ALIASES = {
+    "bitcoin": "BTC", "ethereum": "ETH", "ether": "ETH", "solana": "SOL", "ripple": "XRP",
+    "dogecoin": "DOGE", "litecoin": "LTC", "polkadot": "DOT", "chainlink": "LINK", "avalanche": "AVAX", "tron": "TRX",
+    "比特币": "BTC", "以太坊": "ETH",
+}
+# well-known symbols that can be written in lowercase, any other symbol has to be
+# written as a cashtag or in uppercase ("$gas price", "GAS price") since many are plain words
+FREE_TEXT_SYMBOLS = {
+    "BTC", "ETH", "SOL", "BNB", "XRP", "DOGE", "AVAX", "TRX", "DOT", "LINK", "MATIC", "LTC", "BCH",
+    "UNI", "ICP", "ATOM", "ARB", "APT", "USDT", "USDC", "ETC", "FIL", "SUI", "XLM", "BONK", "INJ",
+    "LDO", "AAVE", "MKR", "STX", "IMX", "HBAR", "KAS", "FTM", "ALGO", "XMR",
+}
+# symbols that collide with the names of other coins, never matched by the router
+SYMBOL_DENYLIST = {"BITCOIN", "METAL", "MELON", "NAVI", "TOKEN"}
+
+DVOL_SYMBOLS = {"BTC", "ETH"}
+MAX_ROUTED_TOKENS = 10
+
+MENTION_PATTERN = re.compile(r"@\w+")
+CJK_WORDS = sorted(
+    (word for word in PRICE_KEYWORDS | CHANGE_KEYWORDS | DVOL_KEYWORDS | INFO_KEYWORDS | FILLER_WORDS | SYMBOL_ALIASES.keys() if re.search(r"[\u4e00-\u9fff]", word)),
+    key=len,
+    reverse=True
+)
+# CJK text is split on known words and apart from latin symbols, so "btc价格是多少" becomes "btc", "价格", "是多少"
+TOKEN_PATTERN = re.compile(
+    "|".join(CJK_WORDS) + r"|[\u4e00-\u9fff]+|[$\w][^\W\u4e00-\u9fff]*(?:[.+\-][^\W\u4e00-\u9fff]*)*"
+)
+
+
+class RouterStats:
+    def __init__(self):
+        self.n_routed = 0
+        self.n_fallback = 0
+        self.n_routed_by_intent: Dict[str, int] = {}
+
+        self.n_llm_calls = 0
+        self.llm_latency_total = 0.0
+        self.llm_tokens_total = 0
+
+        self.latency_saved = 0.0
+        self.tokens_saved = 0
+        self.n_unestimated = 0
+
+    @property
+    def avg_llm_latency(self) -> float:
+        return self.llm_latency_total / self.n_llm_calls if self.n_llm_calls > 0 else 0.0
+
+    @property
+    def avg_llm_tokens(self) -> float:
+        return self.llm_tokens_total / self.n_llm_calls if self.n_llm_calls > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"routed: {self.n_routed}, fallback: {self.n_fallback}, "
+            f"LLM calls: {self.n_llm_calls} (avg {self.avg_llm_latency:.2f}s, {self.avg_llm_tokens:.0f} tokens), "
+            f"saved: {self.latency_saved:.2f}s, {self.tokens_saved} tokens, unestimated: {self.n_unestimated}"
+        )
+
+    def record_fallback(self, reason: str) -> None:
+        """
+        Counts a message the router declined or failed to answer,
+        so it goes to ChatGPT instead.
+        """
+        self.n_fallback += 1
+        logger.info(f"Intent router: falling back to ChatGPT ({reason}) ({self.summary()})")
+
+    def record_llm_call(self, latency: float, n_used_tokens: int) -> None:
+        self.n_llm_calls += 1
+        self.llm_latency_total += latency
+        self.llm_tokens_total += n_used_tokens
+        logger.info(f"Intent router: ChatGPT answered in {latency:.2f}s using {n_used_tokens} tokens ({self.summary()})")
+
+    def record_local_answer(self, intent: str, latency: float) -> None:
+        """
+        Counts a message answered locally. Savings are estimated from
+        the average latency and token usage of the LLM calls seen so far,
+        answers routed before any LLM call are counted as unestimated.
+        """
+        self.n_routed += 1
+        self.n_routed_by_intent[intent] = self.n_routed_by_intent.get(intent, 0) + 1
+        if self.n_llm_calls > 0:
+            self.latency_saved += self.avg_llm_latency - latency
+            self.tokens_saved += round(self.avg_llm_tokens)
+        else:
+            self.n_unestimated += 1
+
+        logger.info(f"Intent router: answered '{intent}' locally in {latency:.2f}s ({self.summary()})")
+
+
+class IntentRouter:
+    def __init__(self, symbol_to_id: Dict[str, str]):
+        # symbols are matched without their cashtag sigil, so "$btc" and "btc" both find BTC
+        self.symbols: Dict[str, str] = {}
+        for symbol in sorted(symbol_to_id, key=lambda symbol: symbol.startswith("$")):
+            if not any(c.isspace() for c in symbol) and symbol.upper().lstrip("$") not in SYMBOL_DENYLIST:
+                self.symbols.setdefault(symbol.upper().lstrip("$"), symbol)
+        self.keyword_to_intent: Dict[str, str] = {}
+        for intent, keywords in (
+            ("info", INFO_KEYWORDS),
+            ("price", PRICE_KEYWORDS),
+            ("change", CHANGE_KEYWORDS),
+            ("dvol", DVOL_KEYWORDS),
+        ):
+            for keyword in keywords:
+                self.keyword_to_intent[keyword] = intent
+
+        self.stats = RouterStats()
+
+    def route(self, message: str) -> Optional[Tuple[str, str]]:
+        """
+        Detects short market-data questions like "btc price?" or "eth dvol now".
+        Returns (intent, symbol) if the message can be answered from market data,
+        otherwise None and the message should go to ChatGPT.
+        """
+        message = MENTION_PATTERN.sub(" ", message)
+        tokens = [token.rstrip(".-") for token in TOKEN_PATTERN.findall(message)]
+        if len(tokens) == 0 or len(tokens) > MAX_ROUTED_TOKENS:
+            return None
+
+        intents = set()
+        symbols = set()
+        for raw_token in tokens:
+            is_cashtag = raw_token.startswith("$")
+            raw_token = raw_token.lstrip("$")
+            token = raw_token.lower()
+            if token in self.keyword_to_intent:
+                intents.add(self.keyword_to_intent[token])
+            elif token in FILLER_WORDS:
+                continue
+            elif token in SYMBOL_ALIASES:
+                symbols.add(SYMBOL_ALIASES[token])
+            elif token.upper() in self.symbols and (is_cashtag or raw_token.isupper() or token.upper() in FREE_TEXT_SYMBOLS):
+                symbols.add(self.symbols[token.upper()])
+            else:
+                # unknown word, so the question is not a plain market-data lookup
+                return None
+
+        if len(intents) == 0 or len(symbols) != 1:
+            return None
+
+        symbol = symbols.pop()
+        if "dvol" in intents:
+            if symbol not in DVOL_SYMBOLS:
+                return None
+            intent = "dvol"
+        elif len(intents) == 1:
+            intent = intents.pop()
+        else:
+            intent = "info"
+
+        return intent, symbol
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# bot modules import each other as top-level modules (eg. `import config`)
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve() / "bot"))
@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import intent_router
+
+
+config_dir = Path(__file__).parent.parent.resolve() / "config"
+with open(config_dir / "SYMBOL2ID.json", 'r') as f:
+    symbol_to_id = json.load(f)
+
+
+@pytest.fixture(scope="module")
+def router():
+    return intent_router.IntentRouter(symbol_to_id)
+
+
+@pytest.mark.parametrize("message, expected", [
+    # plain market-data questions
+    ("btc price?", ("price", "BTC")),
+    ("eth dvol now", ("dvol", "ETH")),
+    ("sol 24h change", ("change", "SOL")),
+    ("what's the price of btc", ("price", "BTC")),
+    ("@signalplus_derivatives_bot btc price", ("price", "BTC")),
+    ("sol volume", ("info", "SOL")),
+    # cashtags and uppercase symbols
+    ("$btc price", ("price", "BTC")),
+    ("$wen price", ("price", "$WEN")),
+    ("$gas price", ("price", "GAS")),
+    ("GAS price", ("price", "GAS")),
+    ("BTC.B price", ("price", "BTC.B")),
+    # coin names resolve through aliases, not SYMBOL2ID keys
+    ("bitcoin price", ("price", "BTC")),
+    ("Ethereum price?", ("price", "ETH")),
+    ("btc bitcoin price", ("price", "BTC")),
+    # Chinese keywords next to a symbol
+    ("BTC价格", ("price", "BTC")),
+    ("eth波动率", ("dvol", "ETH")),
+    ("btc现在的价格是多少", ("price", "BTC")),
+    ("比特币价格", ("price", "BTC")),
+    ("以太坊波动率", ("dvol", "ETH")),
+    # vol means implied vol
+    ("eth vol", ("dvol", "ETH")),
+    ("ETH IV", ("dvol", "ETH")),
+])
+def test_route_market_data_question(router, message, expected):
+    assert router.route(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "how to price options?",
+    "why is btc dropping",
+    "what is bitcoin",
+    "btc eth price",
+    "sol dvol",
+    "sol vol",
+    "hi",
+    "",
+    "btc价格 为什么跌",
+    # plain English words that are also SYMBOL2ID keys
+    "what does cost mean",
+    "what is the cost of gas",
+    "gas price",
+    "you data",
+    "go high",
+    "buy price",
+    "hello price",
+    # symbols colliding with other coins' names
+    "$melon price",
+])
+def test_route_falls_back_to_chatgpt(router, message):
+    assert router.route(message) is None
+
+
+def test_stats_without_llm_baseline():
+    stats = intent_router.RouterStats()
+    stats.record_local_answer("price", 0.8)
+
+    assert stats.n_routed == 1
+    assert stats.latency_saved == 0.0
+    assert stats.tokens_saved == 0
+    assert stats.n_unestimated == 1
+
+
+def test_stats_with_llm_baseline():
+    stats = intent_router.RouterStats()
+    stats.record_llm_call(3.0, 500)
+    stats.record_local_answer("price", 0.8)
+
+    assert stats.latency_saved == pytest.approx(2.2)
+    assert stats.tokens_saved == 500
+    assert stats.n_unestimated == 0
+    assert stats.n_routed_by_intent == {"price": 1}
+
+
+def test_stats_fallback_is_not_an_llm_call():
+    stats = intent_router.RouterStats()
+    stats.record_llm_call(3.0, 500)
+    assert stats.n_fallback == 0
+
+    stats.record_fallback("no market-data intent")
+    assert stats.n_fallback == 1
+    assert stats.n_llm_calls == 1